@@ -3,9 +3,7 @@ Implements a client that generates random points, sends them to the server for p
 """
 import numpy   as     np
 from   socket  import socket, SOCK_STREAM, AF_INET
-from   pickle  import dumps, loads
-from   struct  import pack, unpack
-from   zlib    import compress, decompress
+from   pickle  import loads
 from   time    import time
 from   typing  import Any
 
@@ -16,6 +14,7 @@ def run_client() -> None:
     try:
         with socket(AF_INET, SOCK_STREAM) as sock:
             print(f"[Client] Connecting to server at {HOST}:{PORT}...")
+            tune_socket(sock) # Before connecting, so the receive window is negotiated with the larger buffer
             sock.connect((HOST, PORT))
             
             inpt: str = input(f"[Input] Enter number of points (default {DEFAULT_POINTS}): ")
@@ -27,40 +26,67 @@ def run_client() -> None:
             inpt = input(f"[Input] Enter dimensions (default {DEFAULT_DIMS}): ")
             dims: int = int(inpt) if inpt else DEFAULT_DIMS
 
-            points: CArray[NPoint] = generate_points(pts, dims)
+            # Same limits the server checks the header against, it would only drop the connection without a reply
+            if not 1 <= thr <= MAX_THREADS:
+                print(f"[Error] Threads / processes must be between 1 and {MAX_THREADS}.")
+                return
+            if dims < 2:
+                print("[Error] Dimensions must be at least 2.")
+                return
+            if pts < 0 or pts * dims * WIRE_DTYPE.itemsize > MAX_PAYLOAD:
+                print(f"[Error] Points must be between 0 and {MAX_PAYLOAD // (dims * WIRE_DTYPE.itemsize)} for {dims} dimensions.")
+                return
+
+            points: CArray[NPoint] = generate_points(pts, dims).astype(WIRE_DTYPE, copy=False)
             
-            payload: dict[str, Any]= {"points": points, "threads": thr}
-            print("[Client] Compressing and sending data...")
+            print("[Client] Sending data...")
             st: float = time()
             
-            data: bytes = compress(dumps(payload))
-            sock.sendall(pack('>I', len(data)) + data)
+            send_buffers(sock, REQUEST_HEADER.pack(pts, dims, thr), points)
             
-            data_len: bytes = recv_exact(sock, 4)
-            if not data_len:
+            header: bytearray | None = recv_exact(sock, RESPONSE_HEADER.size)
+            if not header:
                 print("[Error] No response length received.")
                 return
-            resp_len: int = unpack('>I', data_len)[0]
+            resp_len, count = RESPONSE_HEADER.unpack(header)
+            
+            sizes: bytearray | None = recv_exact(sock, count * BUFFER_SIZE.size)
+            if sizes is None:
+                print("[Error] Incomplete data received.")
+                return
             
-            resp: bytes | None = recv_exact(sock, resp_len)
-            if not resp:
+            # The pickle and its buffers are received into one arena, each buffer starting aligned so the arrays over it are too
+            lens: list[int] = [resp_len] + [n for n, in BUFFER_SIZE.iter_unpack(sizes)]
+            offs: list[int] = [0]
+            for n in lens[:-1]: offs.append(offs[-1] + -(-n // BUFFER_ALIGN) * BUFFER_ALIGN)
+            size: int = offs[-1] + lens[-1]
+            raw: CArray[np.uint8] = np.empty(size + BUFFER_ALIGN, dtype=np.uint8)
+            base: int = -raw.ctypes.data % BUFFER_ALIGN # The allocation itself is only 16-byte aligned, so the arena starts at the next boundary
+            arena: memoryview = memoryview(raw[base:base + size])
+            views: list[memoryview] = [arena[o:o + n] for o, n in zip(offs, lens)]
+            if not resp_len or not all(recv_into_exact(sock, v) for v in views):
                 print("[Error] Incomplete data received.")
                 return
+            resp, *buffers = views
             
             tt: float = time() - st
             print(f"[Done] Data received. Total time: {tt:.2f}s")
         
-        result: dict[str, Any] = loads(decompress(resp))
-        hull: list[np.ndarray] = result['hull']
+        result: dict[str, Any] = loads(resp, buffers=buffers)
+        hull: CArray[NPoint] = order_angularly(result['hull'])
 
         print("\n[RESULTS]")
         print(f"Input Size:                    {pts} points")
         print(f"Serial Time:                   {result['serial_time']:.4f} s")
         print(f"Parallel Time (Multithreaded): {result['threaded_time']:.4f} s ({thr} threads)")
-        print(f"Parallel Time (Multiprocess):  {result['processes_time']:.4f} s ({thr} processes)")
-        print(f"Speedup:                       {result['speedup'][0]:.2f}x : {result['speedup'][1]:.2f}x")
+        if result['processes_time'] is None:
+            print("Parallel Time (Multiprocess):  skipped, the server runs without the GIL")
+        else:
+            print(f"Parallel Time (Multiprocess):  {result['processes_time']:.4f} s ({thr} processes)")
+        ps: float | None = result['speedup'][1]
+        print(f"Speedup:                       {result['speedup'][0]:.2f}x : {"skipped" if ps is None else f"{ps:.2f}x"}")
         print(f"Hull Points Amount:            {len(hull)}")
-        print(f"Hull Points:{"   ".join([ f"{"\n" if i % 4 == 0 else ""}{p}" for i, p in enumerate(hull) ])}")
+        print(f"Hull Points:{"   ".join(f"{"\n" if i % 4 == 0 else ""}{p}" for i, p in enumerate(hull))}")
     except ConnectionRefusedError:
         print(f"\n[Error] Could not connect to {HOST}:{PORT}. Is the server running?")
     except Exception as e:
@@ -1,13 +1,20 @@
 """
 ThreadPool and ProcessPool classes that manage pools of workers and a Future class for handling asynchronous results.
 """
-from multiprocessing import Process, Queue as MPQueue
-from threading       import Thread, Event
+from multiprocessing import Process, Queue as MPQueue, get_context
+from multiprocessing.context import BaseContext
+from threading       import Thread, Event, Lock
+from collections     import deque
+from pickle          import dumps, loads
 from queue           import Queue
+from signal          import signal, SIGINT, SIG_IGN
 from typing          import Any, Callable
 
-type Task = tuple[int, Callable, list, dict]
-type Result = tuple[int, bool, Any]
+from utility         import PICKLE_PROTOCOL
+
+type Task = tuple[int, bytes] # Task id, pickled (function, args, kwargs)
+type Result = tuple[int, bytes] # Task id, pickled (success, result or exception)
+type ThreadTask = tuple[Future, Callable, list, dict]
 
 class Future:
     """Represents a future result of an asynchronous computation."""
@@ -38,46 +45,27 @@ class ThreadPool:
     """Represents a thread pool for executing asynchronous tasks."""
     def __init__(self, num_threads: int):
         """Initializes the ThreadPool with a specified number of worker threads."""
-        self.num_threads: int = num_threads
-        self.tasks: Queue[Task] = Queue()
-        self.res_queue: Queue[Result] = Queue()
+        self.num_threads: int = 0
+        self.tasks: Queue[ThreadTask] = Queue()
         self.threads: list[Thread] = []
-        self.futures: dict[int, Future] = {}
-        self.res_hand: Thread = Thread(target=self._handle_results, daemon=True)
-        self.task_count: int = 0
         self._is_shut: bool = False
 
-        self.res_hand.start()
+        self.grow(num_threads)
 
-        for _ in range(num_threads):
-            t = Thread(target=_thread_worker, args=(self.tasks, self.res_queue), daemon=True)
+    def grow(self, count: int) -> None:
+        """Starts `count` more worker threads on the same task queue."""
+        for _ in range(count):
+            t = Thread(target=_thread_worker, args=(self.tasks,), daemon=True)
             t.start()
             self.threads.append(t)
-
-    def _handle_results(self) -> None:
-        """Background thread that moves results from the internal queue to Future objects."""
-        while True:
-            if self._is_shut and not self.futures:
-                break
-            tid, suc, data = self.res_queue.get()
-            
-            future: Future = self.futures.pop(tid, None)
-            if future:
-                if suc:
-                    future.set_result(data)
-                else:
-                    future.set_exception(data)
+        self.num_threads += count
 
     def submit(self, func: Callable, *args: Any, **kwargs: Any) -> Future:
         """Submits a function to be executed by the thread pool."""
         if self._is_shut: raise RuntimeError("[Error] ThreadPool is shut down")
         
         future: Future = Future()
-        tid: int = self.task_count
-        self.task_count += 1
-        
-        self.futures[tid] = future
-        self.tasks.put((tid, func, args, kwargs))
+        self.tasks.put((future, func, args, kwargs))
         return future
 
     def shutdown(self) -> None:
@@ -88,23 +76,30 @@ class ThreadPool:
 
 class ProcessPool:
     """Represents a process pool for executing asynchronous tasks."""
-    def __init__(self, num_processes: int):
-        """Initializes the ProcessPool with a specified number of worker processes."""
-        self.num_processes: int = num_processes
-        self.tasks: MPQueue[Task] = MPQueue()
-        self.res_queue: MPQueue[Result] = MPQueue()
+    def __init__(self, num_processes: int, ctx: BaseContext | None = None):
+        """Initializes the ProcessPool with a specified number of worker processes, started through `ctx` or the default start method."""
+        self.num_processes: int = 0
+        self.ctx: BaseContext = ctx or get_context()
+        self.tasks: MPQueue[Task] = self.ctx.Queue()
+        self.res_queue: MPQueue[Result] = self.ctx.Queue()
         self.processes: list[Process] = []
-        self.futures: dict[int, Future] = {}
+        self.futures: deque[Future | None] = deque() # Pending futures in task id order, starting at `_first_tid`
         self.res_hand: Thread = Thread(target=self._handle_results, daemon=True)
         self.task_count: int = 0
+        self._first_tid: int = 0
+        self._lock: Lock = Lock() # Guards the task ids and `futures`, the pool is shared by concurrent runs
         self._is_shut: bool = False
 
         self.res_hand.start()
+        self.grow(num_processes)
 
-        for _ in range(num_processes):
-            p = Process(target=_process_worker, args=(self.tasks, self.res_queue), daemon=True)
+    def grow(self, count: int) -> None:
+        """Starts `count` more worker processes on the same task and result queues."""
+        for _ in range(count):
+            p = self.ctx.Process(target=_process_worker, args=(self.tasks, self.res_queue), daemon=True)
             p.start()
             self.processes.append(p)
+        self.num_processes += count
 
     def _handle_results(self) -> None:
         """Background thread that moves results from the internal queue to Future objects."""
@@ -113,27 +108,38 @@ class ProcessPool:
                 break
             
             try:
-                tid, suc, data = self.res_queue.get()
+                tid, data = self.res_queue.get()
             except Exception:
                 break
+            suc, res = loads(data)
             
-            future: Future = self.futures.pop(tid, None)
+            with self._lock:
+                slot: int = tid - self._first_tid
+                future: Future | None = self.futures[slot]
+                self.futures[slot] = None
+                while self.futures and self.futures[0] is None:
+                    self.futures.popleft()
+                    self._first_tid += 1
+
             if future:
                 if suc:
-                    future.set_result(data)
+                    future.set_result(res)
                 else:
-                    future.set_exception(data)
+                    future.set_exception(res)
 
     def submit(self, func: Callable, *args: Any, **kwargs: Any) -> Future:
         """Submits a function to be executed by the process pool."""
         if self._is_shut: raise RuntimeError("[Error] ProcessPool is shut down")
         
         future: Future = Future()
-        tid: int = self.task_count
-        self.task_count += 1
-        
-        self.futures[tid] = future
-        self.tasks.put((tid, func, args, kwargs))
+        # Pickled up front with protocol 5, which writes numpy arrays straight from their buffers,
+        # the queue itself would use the default protocol and copy every array through `tobytes`
+        payload: bytes = dumps((func, args, kwargs), protocol=PICKLE_PROTOCOL)
+        with self._lock:
+            tid: int = self.task_count
+            self.task_count += 1
+            self.futures.append(future)
+            self.tasks.put((tid, payload))
         return future
 
     def shutdown(self) -> None:
@@ -143,33 +149,34 @@ class ProcessPool:
         for _ in self.processes: self.tasks.put(None)
         for p in self.processes: p.join()
 
-def _thread_worker(task_queue: Queue[Task], res_queue: Queue[Result]) -> None:
-    """Worker function that retrieves tasks from the queue and executes them."""
+def _thread_worker(task_queue: Queue[ThreadTask]) -> None:
+    """Worker function that retrieves tasks from the queue, executes them and resolves their futures directly."""
     while True:
-        task: Task | None = task_queue.get()
+        task: ThreadTask | None = task_queue.get()
         if task is None:
             task_queue.task_done()
             break
 
-        tid, func, args, kwargs = task
+        future, func, args, kwargs = task
         try:
-            res: Any = func(*args, **kwargs)
-            res_queue.put((tid, True, res))
+            future.set_result(func(*args, **kwargs))
         except Exception as e:
-            res_queue.put((tid, False, Exception(str(e))))
+            future.set_exception(e)
         finally:
             task_queue.task_done()
 
 def _process_worker(task_queue: MPQueue[Task], res_queue: MPQueue[Result]) -> None:
     """Worker function that retrieves tasks from the queue and executes them."""
+    signal(SIGINT, SIG_IGN) # Ctrl+C reaches the whole process group, the parent stops the workers through the queue instead
     while True:
         task: Task | None = task_queue.get()
         if task is None:
             break
 
-        tid, func, args, kwargs = task
+        tid, payload = task
         try:
-            res: Any = func(*args, **kwargs)
-            res_queue.put((tid, True, res))
+            func, args, kwargs = loads(payload)
+            data: bytes = dumps((True, func(*args, **kwargs)), protocol=PICKLE_PROTOCOL)
         except Exception as e:
-            res_queue.put((tid, False, e))
\ No newline at end of file
+            data: bytes = dumps((False, e), protocol=PICKLE_PROTOCOL)
+        res_queue.put((tid, data))
\ No newline at end of file
@@ -1,154 +1,323 @@
 """
 QuickHull algorithm implementation for Convex Hull construction.
 """
-import numpy   as     np
-from   time    import time
-from   typing  import Any
+import numpy                          as     np
+from   multiprocessing               import get_context, get_all_start_methods
+from   multiprocessing.context       import BaseContext
+from   multiprocessing.shared_memory import SharedMemory
+from   threading                     import Lock, Semaphore
+from   atexit                        import register
+from   time                          import time
+from   typing                        import Any, Callable
 
-from   pools   import ThreadPool, ProcessPool, Future
-from   utility import CArray, NPoint
+from   pools                         import ThreadPool, ProcessPool, Future
+from   utility                       import CArray, NPoint, MIN_SPLIT_SIZE, SMALL_HULL_SIZE, MAX_THREADS, gil_enabled
 
-type Task = tuple[CArray[NPoint], NPoint, NPoint, int] # Points within, Start point, End point, Side
-type Partition = tuple[NPoint, Task, Task] # Best point, Side 1, Side 2
+type Index = CArray[np.int32] # Point indices, int64 only past 2^31 points
+type Task = tuple[Index, int, int, int, NPoint] # Point indices within, Start index, End index, Side, Cross products to the line times side
+type Partition = tuple[int, Task, Task] # Best point index, Side 1, Side 2
+type Coords = CArray[np.float64] # Shape (2, N), the x and y coordinates of the points as separate contiguous rows
+type Block = tuple[str, tuple[int, ...], np.dtype] # Shared memory name, Shape, Dtype of the coordinates of a ProcessPool run
 
-def _partition(points: NPoint, p1: NPoint, p2: NPoint, side: int) -> Partition | None:
-    """Partitions points for a single QuickHull step, returning the max point and sub-tasks."""
-    v1x, v1y = p2[0] - p1[0], p2[1] - p1[1]
-    
-    cross: NPoint = (points[:, 1] - p1[1]) * v1x - v1y * (points[:, 0] - p1[0])
-    
-    if side == 1:
-        mask: CArray[bool] = cross > 0
-        if not np.any(mask): return None
-        valid_points: NPoint = points[mask]
-        p_max: NPoint = valid_points[np.argmax(cross[mask])]
+_threads: ThreadPool | None = None # Pools shared by every run, created on first use and kept until exit
+_processes: ProcessPool | None = None
+_pools_lock: Lock = Lock()
+
+def _cross(coords: Coords, a: CArray[NPoint], b: CArray[NPoint], side: int = 1) -> CArray[NPoint]:
+    """Computes the 2D cross product of the line a-b times `side` with every point in a single vectorized pass."""
+    # The sign rides on the direction vector, negating it is exact, so this is bit for bit `side` times the plain cross product at no extra pass
+    # One line per call on purpose, the temporaries of a broadcast (lines, N) pass fall out of cache and cost more than the extra calls
+    cross: CArray[NPoint] = coords[1] - a[1]
+    cross *= (b[0] - a[0]) * side
+    tmp: CArray[NPoint] = coords[0] - a[0]
+    tmp *= (b[1] - a[1]) * side
+    cross -= tmp # In-place ops keep the kernel at two temporaries instead of five
+    return cross
+
+def _prune(coords: Coords) -> tuple[Index, int, int]:
+    """Discards the points strictly inside the Akl-Toussaint octagon spanned by the x, y, x + y and x - y extremes, returning the indices of the rest and of the x extremes."""
+    x, y = coords
+    # Half-width indices halve what every gather reads and every ProcessPool task pickles
+    dtype: type = np.int32 if len(x) <= np.iinfo(np.int32).max else np.intp
+    diag: NPoint = x + y
+    lo_s, hi_s = np.argmin(diag), np.argmax(diag)
+    np.subtract(x, y, out=diag) # x - y reuses the x + y buffer, so the seed search allocates a single N-sized array
+    # Extremes in counter-clockwise order, starting from the leftmost point
+    ext: list[int] = [np.argmin(x), lo_s, np.argmin(y), np.argmax(diag), np.argmax(x), hi_s, np.argmax(y), np.argmin(diag)]
+    poly: CArray[NPoint] = coords[:, ext].T
+    poly = poly[np.any(poly != np.roll(poly, 1, axis=0), axis=1)]
+    if len(poly) < 3: return np.arange(len(x), dtype=dtype), int(ext[0]), int(ext[4])
+    a, b = poly, np.roll(poly, -1, axis=0)
+
+    # Only points outside a box inscribed in the octagon need the exact edge test, which rejects most of them with four comparisons
+    xl, xr = max(x[ext[0]], x[ext[1]], x[ext[7]]), min(x[ext[3]], x[ext[4]], x[ext[5]])
+    yb, yt = max(y[ext[1]], y[ext[2]], y[ext[3]]), min(y[ext[5]], y[ext[6]], y[ext[7]])
+    box: Coords = np.array([[xl, xr, xr, xl], [yb, yb, yt, yt]])
+    if xl < xr and yb < yt and all(np.all(_cross(box, ea, eb) >= 0) for ea, eb in zip(a, b)):
+        cand: Index = np.flatnonzero((x <= xl) | (x >= xr) | (y <= yb) | (y >= yt)).astype(dtype)
     else:
-        mask: CArray[bool] = cross < 0
-        if not np.any(mask): return None
-        valid_points: NPoint = points[mask]
-        p_max: NPoint = valid_points[np.argmin(cross[mask])]
+        cand: Index = np.arange(len(x), dtype=dtype)
 
-    dx1, dy1 = p_max[0] - p1[0], p_max[1] - p1[1]
-    c1: NPoint = (valid_points[:, 1] - p1[1]) * dx1 - dy1 * (valid_points[:, 0] - p1[0])
-    
-    dx2, dy2 = p2[0] - p_max[0], p2[1] - p_max[1]
-    c2: NPoint = (valid_points[:, 1] - p_max[1]) * dx2 - dy2 * (valid_points[:, 0] - p_max[0])
+    # A point is kept if it lies on or outside at least one edge
+    within: Coords = np.take(coords, cand, axis=1)
+    keep: CArray[bool] = np.zeros(len(cand), dtype=bool)
+    for ea, eb in zip(a, b): keep |= _cross(within, ea, eb) <= 0
+
+    # The x extremes lie on the octagon, so they survive the prune and seed the split without another sweep
+    return cand[np.flatnonzero(keep)], int(ext[0]), int(ext[4])
+
+def _split(coords: Coords, idx: Index, i1: int, i2: int) -> tuple[Task, Task]:
+    """Splits the indexed points into the tasks strictly above and strictly below the line p1-p2 in a single pass."""
+    cross: NPoint = _cross(np.take(coords, idx, axis=1), coords[:, i1], coords[:, i2])
+    up, lo = np.flatnonzero(cross > 0), np.flatnonzero(cross < 0)
+    return (idx[up], i1, i2, 1, cross[up]), (idx[lo], i1, i2, -1, -cross[lo])
+
+def _partition(coords: Coords, idx: Index, i1: int, i2: int, side: int, cross: NPoint) -> Partition:
+    """Partitions points already on `side` of the line p1-p2 for a single QuickHull step, returning the max point index and sub-tasks."""
+    # Callers only hand over tasks past `SMALL_HULL_SIZE` or `MIN_SPLIT_SIZE` points, smaller ones finish in `_small_hull`
+    # One gather per coordinate row, so the kernel runs over contiguous memory, np.take skips the generic fancy indexing machinery
+    within: Coords = np.take(coords, idx, axis=1)
+    p1, p2 = coords[:, i1], coords[:, i2]
     
-    if side == 1:
-        s1: NPoint = valid_points[c1 > 0]
-        s2: NPoint = valid_points[c2 > 0]
-    else:
-        s1: NPoint = valid_points[c1 < 0]
-        s2: NPoint = valid_points[c2 < 0]
+    # The cross products to p1-p2 were left over from the parent step, so a step makes two passes over the points, one per sub-line
+    i_max: int = np.argmax(cross)
+    p_max: NPoint = within[:, i_max]
+    m: int = int(idx[i_max])
+
+    sub1: NPoint = _cross(within, p1, p_max, side)
+    sub2: NPoint = _cross(within, p_max, p2, side)
+    # Selecting through compact positions beats boolean indexing, which costs a branch per element and runs twice per mask
+    k1, k2 = np.flatnonzero(sub1 > 0), np.flatnonzero(sub2 > 0)
         
-    return p_max, (s1, p1, p_max, side), (s2, p_max, p2, side)
+    return m, (idx[k1], i1, m, side, sub1[k1]), (idx[k2], m, i2, side, sub2[k2])
 
-def _quickhull_step(points: NPoint, p1: NPoint, p2: NPoint, side: int) -> list[NPoint]:
-    """Recursively computes the convex hull for points on one side of the line p1-p2."""
-    part: Partition | None = _partition(points, p1, p2, side)
-    if part is None: return []
+def _small_hull(coords: Coords, idx: Index, i1: int, i2: int, side: int, cross: NPoint) -> list[int]:
+    """Finishes a small task with the same QuickHull steps over plain floats, cheaper than a kernel launch per step at this size."""
+    if not len(idx): return []
+    ids: list[int] = idx.tolist()
+    xs, ys = coords[0, idx].tolist(), coords[1, idx].tolist()
+    p1, p2 = tuple(coords[:, i1].tolist()), tuple(coords[:, i2].tolist())
+    hull: list[int] = []
+    stack: list[tuple[list[int], tuple, tuple, list[float]]] = [(list(range(len(ids))), p1, p2, cross.tolist())]
+
+    while stack:
+        members, a, b, cr = stack.pop()
+        # A bound C method as the key avoids a Python frame per point, and max keeps the first maximum like np.argmax
+        j: int = max(range(len(members)), key=cr.__getitem__)
+        m: int = members[j]
+        hull.append(ids[m])
+        for a, b in ((a, (xs[m], ys[m])), ((xs[m], ys[m]), b)):
+            # Same operation order as `_cross`, so every side test agrees bit for bit with the vector path
+            dx, dy = (b[0] - a[0]) * side, (b[1] - a[1]) * side
+            sub: list[float] = [(ys[k] - a[1]) * dx - (xs[k] - a[0]) * dy for k in members]
+            keep: list[int] = [i for i, c in enumerate(sub) if c > 0]
+            if keep: stack.append(([members[i] for i in keep], a, b, [sub[i] for i in keep]))
+
+    return hull
+
+def _quickhull_step(coords: Coords, idx: Index, i1: int, i2: int, side: int, cross: NPoint) -> list[int]:
+    """Computes the hull point indices for points on one side of the line p1-p2, working through an explicit stack of sub-tasks."""
+    hull: list[int] = []
+    stack: list[Task] = [(idx, i1, i2, side, cross)]
     
-    p_max, t1, t2 = part
+    while stack:
+        task: Task = stack.pop()
+        if len(task[0]) <= SMALL_HULL_SIZE:
+            hull += _small_hull(coords, *task)
+            continue
+        m, t1, t2 = _partition(coords, *task)
+        hull.append(m)
+        for t in (t1, t2):
+            # A lone point is a hull point outright, so it never takes a round trip through the stack
+            if len(t[0]) > 1: stack.append(t)
+            elif len(t[0]): hull.append(int(t[0][0]))
 
-    return _quickhull_step(*t1) + [p_max] + _quickhull_step(*t2)
+    return hull
 
-def run_serial(points: CArray[NPoint]) -> list[NPoint]:
-    """Runs the QuickHull algorithm sequentially."""
-    if len(points) < 3: return list(points)
+def _sharing_step(pool: ThreadPool, coords: Coords, split_size: int, slots: Semaphore, tasks: list[Task]) -> tuple[list[int], list[Future]]:
+    """Works through tasks like `_quickhull_step`, but submits one sub-task of each split of at least `split_size` points back to the pool while the run has a worker slot free."""
+    hull: list[int] = []
+    spawned: list[Future] = []
+    stack: list[Task] = list(tasks)
+
+    try:
+        while stack:
+            task: Task = stack.pop()
+            if len(task[0]) < split_size:
+                hull += _quickhull_step(coords, *task)
+                continue
+            m, t1, t2 = _partition(coords, *task)
+            hull.append(m)
+            # The result futures go back to the caller instead of being waited on here, so no worker ever blocks on another
+            if len(t1[0]) >= split_size and slots.acquire(blocking=False): spawned.append(pool.submit(_sharing_step, pool, coords, split_size, slots, [t1]))
+            else: stack.append(t1)
+            stack.append(t2)
+    finally:
+        slots.release() # Every step holds one of the run's slots until it is done
     
-    min_x: NPoint = points[np.argmin(points[:, 0])]
-    max_x: NPoint = points[np.argmax(points[:, 0])]
+    return hull, spawned
 
-    hull: list[NPoint] = [min_x, max_x] + _quickhull_step(points, min_x, max_x, 1) + _quickhull_step(points, min_x, max_x, -1)
+def _on_block(block: Block, fn: Callable[[Coords], Any]) -> Any:
+    """Runs `fn` on the shared coordinates of a run, attaching for this batch only so an idle worker never keeps a finished run's block mapped."""
+    name, shape, dtype = block
+    shm: SharedMemory = SharedMemory(name=name, track=False)
+    coords: Coords | None = np.ndarray(shape, dtype, buffer=shm.buf)
+    try:
+        return fn(coords)
+    finally:
+        coords = None # The view has to go before the mapping can be closed
+        try:
+            shm.close()
+        except BufferError:
+            pass # A traceback still holds a view, the mapping goes with it
 
-    hull_np: NPoint = np.array(hull)
-    return list(np.unique(hull_np, axis=0))
+def _worker_partition_batch(block: Block, tasks: list[Task]) -> list[Partition]:
+    """Runs `_partition` for a batch of tasks on the shared coordinates of a run."""
+    return _on_block(block, lambda coords: [_partition(coords, *task) for task in tasks])
 
-def run_parallel_thread(points: CArray[NPoint], num_threads: int) -> list[NPoint]:
-    """Runs the QuickHull algorithm in parallel using a ThreadPool."""
-    if len(points) < 3: return list(points)
+def _worker_quickhull_batch(block: Block, tasks: list[Task]) -> list[int]:
+    """Runs `_quickhull_step` for a batch of tasks on the shared coordinates of a run."""
+    return _on_block(block, lambda coords: [m for task in tasks for m in _quickhull_step(coords, *task)])
 
-    min_x: NPoint = points[np.argmin(points[:, 0])]
-    max_x: NPoint = points[np.argmax(points[:, 0])]
-    
-    hull: list[NPoint] = [min_x, max_x]
-    cur_tasks: list[Task] = [(points, min_x, max_x, 1), (points, min_x, max_x, -1)]
-    
-    tar: int = num_threads * 4
-    pool: ThreadPool = ThreadPool(num_threads)
+def _thread_pool(workers: int) -> ThreadPool:
+    """Returns the shared ThreadPool, created on first use and grown to the largest worker count asked for so far, up to `MAX_THREADS`."""
+    global _threads
+    workers = min(workers, MAX_THREADS)
+    with _pools_lock:
+        if _threads is None: _threads = ThreadPool(workers)
+        elif _threads.num_threads < workers: _threads.grow(workers - _threads.num_threads)
+        return _threads
 
-    while len(cur_tasks) < tar and cur_tasks:
-        futures: list[Future] = [pool.submit(_partition, *args) for args in cur_tasks]
-        next_tasks: list[Task] = []
+def _start_context() -> BaseContext:
+    """Returns the context the shared ProcessPool starts its workers from, a fresh forkserver where the platform has one."""
+    # The pool is started and grown from handler threads, a plain fork would hand every worker the sockets and shared memory blocks open at that moment
+    return get_context("forkserver" if "forkserver" in get_all_start_methods() else "spawn")
 
-        for f in futures:
-            res: Partition | None = f.get_result()
-            if not res: continue
-            p_max, t1, t2 = res
-            hull.append(p_max)
-            if t1[0].size > 0: next_tasks.append(t1)
-            if t2[0].size > 0: next_tasks.append(t2)
-        cur_tasks = next_tasks
-
-    futures: list[Future] = [pool.submit(_quickhull_step, *args) for args in cur_tasks]
-    
-    for f in futures:
-        hull += f.get_result()
+def _process_pool(workers: int) -> ProcessPool:
+    """Returns the shared ProcessPool, created on first use and grown to the largest worker count asked for so far, up to `MAX_THREADS`, so only new workers pay the start-up."""
+    global _processes
+    workers = min(workers, MAX_THREADS)
+    with _pools_lock:
+        if _processes is None: _processes = ProcessPool(workers, _start_context())
+        elif _processes.num_processes < workers: _processes.grow(workers - _processes.num_processes)
+        return _processes
+
+@register
+def _shutdown_pools() -> None:
+    """Shuts down the shared pools when the interpreter exits."""
+    global _threads, _processes
+    with _pools_lock:
+        for pool in (_threads, _processes):
+            if pool: pool.shutdown()
+        _threads = _processes = None
+
+def _batches(tasks: list[Task], count: int) -> list[list[Task]]:
+    """Deals the tasks round-robin into at most `count` batches, so each worker call amortizes one queue round trip over several tasks."""
+    return [tasks[i::count] for i in range(min(count, len(tasks)))]
+
+def _setup(points: CArray[NPoint]) -> tuple[CArray[NPoint], Coords, Index, Task, Task, list[int]]:
+    """Normalizes the input, prunes it and splits it at the x extremes, returning the points, coordinates, candidates, both root tasks and the seed hull."""
+    points = np.asarray(points, dtype=np.float64)
+    coords: Coords = np.ascontiguousarray(points[:, :2].T)
+    if len(points) < 3:
+        # Too few points to span a line, so they all are the hull and there is nothing to split
+        none: Index = np.arange(0, dtype=np.int32)
+        empty: Task = (none, 0, 0, 1, np.empty(0))
+        return points, coords, none, empty, empty, list(range(len(points)))
+
+    cand, min_x, max_x = _prune(coords)
+    upper, lower = _split(coords, cand, min_x, max_x)
+    return points, coords, cand, upper, lower, [min_x, max_x]
+
+def _collect(points: CArray[NPoint], hull: list[int]) -> CArray[NPoint]:
+    """Returns the hull points in input order, each once."""
+    # Near-collinear points can test > 0 against both sub-lines in floating point and be found twice, the equal seeds of a vertical input too
+    return points[np.unique(np.asarray(hull, dtype=np.intp))] # An explicit dtype keeps the empty hull of an empty input a valid index
+
+def run_serial(points: CArray[NPoint]) -> CArray[NPoint]:
+    """Runs the QuickHull algorithm sequentially."""
+    points, coords, _, upper, lower, hull = _setup(points)
+    hull += _quickhull_step(coords, *upper) + _quickhull_step(coords, *lower)
+
+    return _collect(points, hull)
+
+def run_parallel_thread(points: CArray[NPoint], num_threads: int) -> CArray[NPoint]:
+    """Runs the QuickHull algorithm in parallel using a ThreadPool."""
+    points, coords, cand, upper, lower, hull = _setup(points)
+    split_size: int = max(MIN_SPLIT_SIZE, len(cand) // (num_threads * 8))
+    pool: ThreadPool = _thread_pool(num_threads)
+    roots: list[list[Task]] = _batches([t for t in (upper, lower) if len(t[0])], num_threads)
+    # The pool is shared, so the slots are what keeps this run at `num_threads` workers, each root batch already holds one
+    slots: Semaphore = Semaphore(num_threads - len(roots))
+
+    # Workers hand their large sub-tasks back to the pool as they go, so the load balances itself without a breadth-first warm-up
+    pending: list[Future] = [pool.submit(_sharing_step, pool, coords, split_size, slots, batch) for batch in roots]
+    while pending:
+        part_hull, spawned = pending.pop().get_result()
+        hull += part_hull
+        pending += spawned
             
-    pool.shutdown()
-    hull_np: CArray[NPoint] = np.array(hull)
-    return list(np.unique(hull_np, axis=0))
+    return _collect(points, hull)
 
-def run_parallel_process(points: CArray[NPoint], num_procs: int) -> list[NPoint]:
+def run_parallel_process(points: CArray[NPoint], num_procs: int) -> CArray[NPoint]:
     """Runs the QuickHull algorithm in parallel using a ProcessPool."""
-    if len(points) < 3: return list(points)
-
-    min_x: NPoint = points[np.argmin(points[:, 0])]
-    max_x: NPoint = points[np.argmax(points[:, 0])]
-    
-    hull: list[NPoint] = [min_x, max_x]
-    cur_tasks: list[Task] = [(points, min_x, max_x, 1), (points, min_x, max_x, -1)]
-    
+    points, coords, cand, upper, lower, hull = _setup(points)
     tar: int = num_procs * 4
-    pool: ProcessPool = ProcessPool(num_procs)
+    split_size: int = max(MIN_SPLIT_SIZE, len(cand) // (num_procs * 8))
+    cur_tasks: list[Task] = [t for t in (upper, lower) if len(t[0]) >= split_size]
+    leaf_tasks: list[Task] = [t for t in (upper, lower) if 0 < len(t[0]) < split_size]
+    # Like the thread runner, any work at all goes through the pool, so both parallel timings measure their workers
+    if not cur_tasks and not leaf_tasks: return _collect(points, hull)
+
+    pool: ProcessPool = _process_pool(num_procs) # At most `num_procs` batches are in flight per round, so a larger shared pool does not widen the run
+    shm: SharedMemory = SharedMemory(create=True, size=coords.nbytes)
+    np.ndarray(coords.shape, coords.dtype, buffer=shm.buf)[:] = coords
+    block: Block = (shm.name, coords.shape, coords.dtype)
 
-    while len(cur_tasks) < tar and cur_tasks:
-        futures: list[Future] = [pool.submit(_partition, *args) for args in cur_tasks]
-        next_tasks: list[Task] = []
+    try:
+        while len(cur_tasks) < tar and cur_tasks:
+            futures: list[Future] = [pool.submit(_worker_partition_batch, block, batch) for batch in _batches(cur_tasks, num_procs)]
+            next_tasks: list[Task] = []
 
+            for f in futures:
+                for m, t1, t2 in f.get_result():
+                    hull.append(m)
+                    for t in (t1, t2):
+                        # Small tasks cost more to hand out than to finish, so they are not split any further
+                        if len(t[0]) >= split_size: next_tasks.append(t)
+                        elif len(t[0]): leaf_tasks.append(t)
+            cur_tasks = next_tasks
+
+        cur_tasks += leaf_tasks
+        futures: list[Future] = [pool.submit(_worker_quickhull_batch, block, batch) for batch in _batches(cur_tasks, num_procs)]
+        
         for f in futures:
-            res: Partition | None = f.get_result()
-            if not res: continue
-            p_max, t1, t2 = res
-            hull.append(p_max)
-            if t1[0].size > 0: next_tasks.append(t1)
-            if t2[0].size > 0: next_tasks.append(t2)
-        cur_tasks = next_tasks
-
-    futures: list[Future] = [pool.submit(_quickhull_step, *args) for args in cur_tasks]
-    
-    for f in futures:
-        hull += f.get_result()
-            
-    pool.shutdown()
-    hull_np: CArray[NPoint] = np.array(hull)
-    return list(np.unique(hull_np, axis=0))
+            hull += f.get_result()
+    finally:
+        shm.close()
+        shm.unlink()
+    return _collect(points, hull)
 
 def benchmark(points: CArray[NPoint], threads: int) -> dict[str, Any]:
-    """Runs both serial and parallel implementations and returns timing results."""
+    """Runs both serial and parallel implementations and returns timing results, the process runner is skipped on free-threaded builds."""
     beg: float = time()
-    res1: list[NPoint] = run_serial(points)
+    res1: CArray[NPoint] = run_serial(points)
     st: float = time() - beg
 
     beg = time()
-    res2: list[NPoint] = run_parallel_thread(points, threads)
+    res2: CArray[NPoint] = run_parallel_thread(points, threads)
     tt: float = time() - beg
 
-    beg = time()
-    res3: list[NPoint] = run_parallel_process(points, threads)
-    pt: float = time() - beg
+    # Without the GIL the threads already run in parallel, so processes would only add start-up and IPC on top
+    pt: float | None = None
+    if gil_enabled():
+        beg = time()
+        res3: CArray[NPoint] = run_parallel_process(points, threads)
+        pt = time() - beg
+        if not np.array_equal(res1, res3):
+            raise RuntimeError("[Error] Results aren't equal")
     
-    if not np.array_equal(res1, res2) or not np.array_equal(res1, res3):
+    if not np.array_equal(res1, res2):
         raise RuntimeError("[Error] Results aren't equal")
 
     return {
@@ -156,5 +325,5 @@ def benchmark(points: CArray[NPoint], threads: int) -> dict[str, Any]:
         "serial_time": st,
         "threaded_time": tt,
         "processes_time": pt,
-        "speedup": ((st / tt if tt > 0 else 0), (st / pt if pt > 0 else 0))
+        "speedup": ((st / tt if tt > 0 else 0), None if pt is None else (st / pt if pt > 0 else 0))
     }
\ No newline at end of file
@@ -1,53 +1,64 @@
 """
 Implements a multi-threaded server that listens for client connections, receives point data, and computes the convex hull using parallel processing.
 """
-from socket    import socket, timeout, AF_INET, SOCK_STREAM, SO_REUSEADDR, SOL_SOCKET
-from pickle    import dumps, loads
-from struct    import pack, unpack
-from zlib      import compress, decompress
-from typing    import Any
+import numpy     as     np
+from   socket    import socket, socketpair, AF_INET, SOCK_STREAM, SO_REUSEADDR, SOL_SOCKET
+from   signal    import set_wakeup_fd
+from   selectors import DefaultSelector, EVENT_READ
+from   threading import local
+from   pickle    import dumps, PickleBuffer
+from   time      import monotonic
+from   typing    import Any
 
-from quickhull import benchmark
-from utility   import recv_exact, HOST, PORT, DEFAULT_THREADS
-from pools     import ThreadPool
+from   quickhull import benchmark
+from   utility   import gil_enabled, tune_socket, recv_exact, recv_into_exact, send_buffers, CArray, NPoint, HOST, PORT, REQUEST_HEADER, RESPONSE_HEADER, BUFFER_SIZE, WIRE_DTYPE, MAX_PAYLOAD, MAX_THREADS, ARENA_SIZE, PICKLE_PROTOCOL, SERVER_WORKERS, CHUNK_SIZE, ACCEPT_RETRY_DELAY
+from   pools     import ThreadPool
+
+_arena: local = local() # Receive memory of each handler thread, reused by its next request
+
+def payload_buffer(size: int) -> memoryview:
+    """Returns `size` bytes of receive memory, from the handler thread's arena when it fits, so repeat requests skip mapping and faulting in fresh pages."""
+    if size > ARENA_SIZE: return memoryview(bytearray(size))
+    buf: bytearray | None = getattr(_arena, "buf", None)
+    if buf is None or len(buf) < size:
+        buf = _arena.buf = bytearray(size)
+    return memoryview(buf)[:size]
 
 def check_gil_status() -> None:
     """Checks and prints whether the Global Interpreter Lock (GIL) is enabled."""
-    import sys
-    if hasattr(sys, "_is_gil_enabled"):
-        gil: bool = sys._is_gil_enabled()
-        st: str = "ENABLED" if gil else "DISABLED"
-    else:
-        gil: bool = True
-        st: str = "ENABLED (Standard Build)"
-
+    st: str = "ENABLED" if gil_enabled() else "DISABLED"
     print(f"[Info] GIL Status: {st}")
 
 def handle_client(sock: socket, addr: tuple[str, int]) -> None:
     """Handles a single client connection, processing the request and sending the response."""
     print(f"[Server] Accepted connection from {addr[0]}:{addr[1]}.")
     try:
-        data_len: bytes = recv_exact(sock, 4)
-        if not data_len:
+        header: bytearray | None = recv_exact(sock, REQUEST_HEADER.size)
+        if not header:
             print("[Error] Incomplete data received.")
             return
-        msg_len: int = unpack('>I', data_len)[0]
+        pts, dims, thr = REQUEST_HEADER.unpack(header)
+        if dims < 2 or not 1 <= thr <= MAX_THREADS or pts * dims * WIRE_DTYPE.itemsize > MAX_PAYLOAD:
+            print(f"[Error] Invalid request header: {pts} points, {dims} dimensions, {thr} threads.")
+            return
         
-        comp_data: bytes = recv_exact(sock, msg_len)
-        if not comp_data:
+        # The coordinates land straight in the array the hull is computed on, the response is sent before the arena is reused
+        points: CArray[NPoint] = np.frombuffer(payload_buffer(pts * dims * WIRE_DTYPE.itemsize), dtype=WIRE_DTYPE).reshape(pts, dims)
+        if not recv_into_exact(sock, points):
+            print("[Error] Incomplete data received.")
             return
 
-        req: dict[str, Any]= loads(decompress(comp_data))
-        
-        points: Any = req.get('points', [])
-        thr: int = req.get('threads', DEFAULT_THREADS)
         print(f"[Process] Processing {len(points)} points with {thr} threads / processes.")
         
         res: dict[str, Any]= benchmark(points, thr)
         print(f"[Done] Data processed. Returning response to {addr[0]}:{addr[1]}.")
         
-        res_bytes: bytes = compress(dumps(res))
-        sock.sendall(pack('>I', len(res_bytes)) + res_bytes)
+        # Arrays leave the pickle as out-of-band buffers and go onto the socket straight from their own memory, uncompressed
+        buffers: list[PickleBuffer] = []
+        res_bytes: bytes = dumps(res, protocol=PICKLE_PROTOCOL, buffer_callback=buffers.append)
+        raw: list[memoryview] = [b.raw() for b in buffers]
+        sizes: bytes = b"".join(BUFFER_SIZE.pack(r.nbytes) for r in raw)
+        send_buffers(sock, RESPONSE_HEADER.pack(len(res_bytes), len(raw)), sizes, res_bytes, *raw)
     except Exception as e:
         print(f"[Error] Processing error: {e}")
     finally:
@@ -57,26 +68,53 @@ def handle_client(sock: socket, addr: tuple[str, int]) -> None:
 def run_server() -> None:
     """Starts the server to listen for incoming connections."""
     check_gil_status()
-    pool: ThreadPool = ThreadPool(4)
+    pool: ThreadPool = ThreadPool(SERVER_WORKERS)
 
-    with socket(AF_INET, SOCK_STREAM) as sock:
+    wake, wake_w = socketpair() # Signal wakeup channel, the interpreter writes to it whenever a signal such as Ctrl+C arrives
+    with socket(AF_INET, SOCK_STREAM) as sock, DefaultSelector() as sel, wake, wake_w:
         sock.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
+        tune_socket(sock) # Accepted connections inherit the options, and the receive window is negotiated with the larger buffer
         sock.bind((HOST, PORT))
         sock.listen()
         print(f"[Server] Listening on {HOST}:{PORT}")
-        sock.settimeout(1.0) 
+        # Readiness comes from the platform poller (epoll, kqueue, ...), which blocks until a connection or a signal arrives
+        sock.setblocking(False)
+        wake.setblocking(False)
+        wake_w.setblocking(False)
+        sel.register(sock, EVENT_READ)
+        sel.register(wake, EVENT_READ)
+        prev: int = set_wakeup_fd(wake_w.fileno())
+        resume: float | None = None # When a listener paused by a failed accept is registered again
         try:
             while True:
-                try:
-                    conn, addr = sock.accept()
-                    conn.settimeout(None) 
-                    
-                    pool.submit(handle_client, conn, addr)
-                except timeout:
-                    continue
+                if resume is not None and monotonic() >= resume:
+                    sel.register(sock, EVENT_READ)
+                    resume = None
+                for key, _ in sel.select(None if resume is None else max(0.0, resume - monotonic())):
+                    if key.fileobj is wake:
+                        wake.recv(CHUNK_SIZE) # The signal handler itself runs, and raises KeyboardInterrupt, once the select returns
+                        continue
+                    # One readiness event drains the whole backlog, so a burst of connections costs one poll instead of one each
+                    while True:
+                        try:
+                            conn, addr = sock.accept()
+                        except BlockingIOError:
+                            break # Backlog empty, or the client gave up between the readiness event and the accept on Linux
+                        except ConnectionAbortedError:
+                            continue # The client gave up between the readiness event and the accept on BSD / macOS
+                        except OSError as e:
+                            # Out of descriptors and the like, the listener stays readable, so it sits out the select for a while instead of spinning on it
+                            print(f"[Error] Accept failed: {e}, retrying in {ACCEPT_RETRY_DELAY:.0f}s")
+                            sel.unregister(sock)
+                            resume = monotonic() + ACCEPT_RETRY_DELAY
+                            break
+                        conn.setblocking(True)
+                        
+                        pool.submit(handle_client, conn, addr)
         except KeyboardInterrupt:
             print("[Stop] Server stopping...")
         finally:
+            set_wakeup_fd(prev)
             pool.shutdown()
             sock.close()
 
@@ -2,33 +2,89 @@
 Utility functions and constants.
 """
 import numpy  as     np
-from   socket import socket
+import sys
+from   socket import socket, IPPROTO_TCP, SOL_SOCKET, SO_RCVBUF, SO_SNDBUF, TCP_NODELAY
+from   struct import Struct
 
 HOST: str = "127.0.0.1"
 PORT: int = 65432
-CHUNK_SIZE: int = 4096 # Standard page size
+CHUNK_SIZE: int = 1024 * 1024 # Bytes requested per recv call
+SOCKET_BUFFER: int = 4 * 1024 * 1024 # Kernel send / receive buffer size
+PICKLE_PROTOCOL: int = 5 # Out-of-band capable protocol, numpy arrays are pickled as raw buffers
 DEFAULT_POINTS: int = 1_000_000
 DEFAULT_THREADS: int = 4
+SERVER_WORKERS: int = 4 # Connections handled at once, later ones wait in the pool's queue instead of competing for the cores
+ACCEPT_RETRY_DELAY: float = 1.0 # Seconds the server stops accepting after running out of descriptors, the same pause asyncio takes
+MIN_SPLIT_SIZE: int = 4096 # Tasks with fewer points are finished by a single worker instead of split further
+SMALL_HULL_SIZE: int = 32 # Tasks with at most this many points are finished over plain floats instead of more vector kernels
 DEFAULT_DIMS: int = 2
 DEFAULT_MARGINS: tuple[int, int] = -100_000, 100_000
 SEED: int | None = None #9999879
+REQUEST_HEADER: Struct = Struct('>III') # Points, Dimensions, Threads
+RESPONSE_HEADER: Struct = Struct('>II') # Pickle length, Out-of-band buffer count
+BUFFER_SIZE: Struct = Struct('>Q') # Length of one out-of-band buffer, sent ahead of the pickle
+BUFFER_ALIGN: int = 64 # Alignment of each out-of-band buffer inside the client's receive arena
+WIRE_DTYPE: np.dtype = np.dtype('<f8') # Coordinates are sent as raw little-endian float64
+MAX_THREADS: int = 64 # Largest worker count a request may ask for, past it the split sizes only shrink into per-task overhead
+MAX_PAYLOAD: int = 1 << 30 # Largest point payload the server accepts, so a bogus header cannot make it preallocate arbitrary memory
+ARENA_SIZE: int = 64 * 1024 * 1024 # Largest point payload a server handler thread keeps its receive memory for
 
 type CArray = np.ndarray
 type NPoint = CArray[np.float64]
 
-def recv_exact(sock: socket, size: int) -> bytes | None:
+def gil_enabled() -> bool:
+    """Returns whether the Global Interpreter Lock is enabled, which it always is on builds without free threading."""
+    return sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True
+
+def tune_socket(sock: socket) -> None:
+    """Disables Nagle's algorithm and enlarges the kernel buffers for bulk one-shot transfers."""
+    sock.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
+    sock.setsockopt(SOL_SOCKET, SO_SNDBUF, SOCKET_BUFFER)
+    sock.setsockopt(SOL_SOCKET, SO_RCVBUF, SOCKET_BUFFER)
+
+def send_buffers(sock: socket, *buffers: bytes | memoryview | np.ndarray) -> None:
+    """Sends all buffers in order, using vectored `sendmsg` calls where the platform supports them."""
+    if not hasattr(sock, "sendmsg"):
+        for buf in buffers: sock.sendall(buf)
+        return
+
+    views: list[memoryview] = [view.cast('B') for view in map(memoryview, buffers) if view.nbytes]
+    while views:
+        sent: int = sock.sendmsg(views)
+        while views and sent >= len(views[0]):
+            sent -= len(views.pop(0))
+        if sent:
+            views[0] = views[0][sent:]
+
+def recv_into_exact(sock: socket, buf: bytearray | memoryview | np.ndarray) -> bool:
+    """Fills the whole writable buffer from the socket connection, returning False if the peer closes first."""
+    view: memoryview = memoryview(buf)
+    size: int = view.nbytes
+    if size: view = view.cast('B') # Empty views with zeros in their shape cannot be cast, and need no receive anyway
+    off: int = 0
+    while off < size:
+        rec: int = sock.recv_into(view[off:], min(size - off, CHUNK_SIZE))
+        if not rec:
+            return False
+        off += rec
+    return True
+
+def recv_exact(sock: socket, size: int) -> bytearray | None:
     """Receives exactly `size` bytes from the socket connection."""
-    buf: bytes = b''
-    while len(buf) < size:
-        pack: bytes | None = sock.recv(min(size - len(buf), CHUNK_SIZE))
-        if not pack:
-            return None
-        buf += pack
-    return buf
-
-def generate_points(n: int, dims: int = DEFAULT_DIMS, min_val: int = DEFAULT_MARGINS[0], max_val: int = DEFAULT_MARGINS[1], seed: int | None = None) -> CArray[NPoint]:
-    """Generates a list of N random points with specified dimensions."""
+    buf: bytearray = bytearray(size)
+    return buf if recv_into_exact(sock, buf) else None
+
+def generate_points(n: int, dims: int = DEFAULT_DIMS, min_val: int = DEFAULT_MARGINS[0], max_val: int = DEFAULT_MARGINS[1], seed: int | None = None, round_decimals: int | None = 2) -> CArray[NPoint]:
+    """Generates a list of N random points with specified dimensions, rounded to `round_decimals` unless it is None."""
     print(f"[Generate] {n} random points with {dims} dimensions.")
     rng: np.random.Generator = np.random.default_rng(seed)
     pts: CArray[NPoint] = rng.uniform(min_val, max_val, (n, dims))
-    return np.round(pts, 2)
+    if round_decimals is None: return pts # Skips a full pass, the hull does not need the rounding
+    return np.round(pts, round_decimals, out=pts)
+
+def order_angularly(points: CArray[NPoint]) -> CArray[NPoint]:
+    """Orders points counter-clockwise around their centroid, turning a set of hull points into a polygon."""
+    if not len(points): return points
+    c: NPoint = points.mean(axis=0)
+    ang: NPoint = np.arctan2(points[:, 1] - c[1], points[:, 0] - c[0])
+    return points[np.argsort(ang)]